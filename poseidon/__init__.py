@@ -1,2 +1,3 @@
 from .hash import Poseidon, OptimizedPoseidon, HashType
+from .factory import get_poseidon
 from .parameters import *
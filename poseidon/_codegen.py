@@ -0,0 +1,59 @@
+"""
+Generation of a Poseidon permutation specialized for one instance.
+
+All parameters are fixed at construction time, so the rounds are unrolled into straight-line python code with
+the prime, the MDS matrix and the round constants inlined as int literals.
+"""
+import functools
+
+# constant-folded exponent chains of the s-box, `{0}` is the state element and `{1}` the modulus;
+# they beat the generic pow only for single-word primes, larger ones keep pow
+S_BOX_CHAINS = {
+    3: ['{0} = {0} * {0} % {1} * {0} % {1}'],
+    5: ['x2 = {0} * {0} % {1}', '{0} = x2 * x2 % {1} * {0} % {1}'],
+}
+S_BOX_CHAIN_MAX_BITS = 64
+
+
+@functools.lru_cache(maxsize=32)
+def generate(p, t, alpha, mds, rc_per_round, half_full_round, partial_round):
+    """
+    :param int p: The prime field modulus.
+    :param int t: The size of Poseidon's inner state.
+    :param int alpha: The power of S-box.
+    :param tuple mds: MDS matrix as t tuples of t ints.
+    :param tuple rc_per_round: Round constants as (full_round + partial_round) tuples of t ints.
+    :param int half_full_round: Half the number of full rounds.
+    :param int partial_round: Number of partial rounds.
+    :return: Function of t ints returning the second element of the permuted state.
+    :rtype callable:
+    """
+    names = ['s{}'.format(i) for i in range(t)]
+    p_hex = hex(p)
+    lines = ['def permutation({}, *, pow=pow):'.format(', '.join(names))]
+    chain = S_BOX_CHAINS.get(alpha) if p.bit_length() <= S_BOX_CHAIN_MAX_BITS else None
+
+    for r, rc_block in enumerate(rc_per_round):
+        full = not (half_full_round <= r < half_full_round + partial_round)
+        lines.append('    # round {} ({})'.format(r, 'full' if full else 'partial'))
+
+        # add round constants, apply s-box
+        for i, (name, c) in enumerate(zip(names, rc_block)):
+            if (full or i == 0) and chain is not None:
+                lines.append('    {0} = {0} + {1}'.format(name, hex(c)))
+                lines.extend('    ' + step.format(name, p_hex) for step in chain)
+            elif full or i == 0:
+                lines.append('    {0} = pow({0} + {1}, {2}, {3})'.format(name, hex(c), alpha, p_hex))
+            else:
+                lines.append('    {0} = {0} + {1}'.format(name, hex(c)))
+
+        # apply MDS matrix
+        rows = ['({}) % {}'.format(' + '.join('{} * {}'.format(hex(m), name) for m, name in zip(row, names)), p_hex)
+                for row in mds]
+        lines.append('    {} = {}'.format(', '.join(names), ', '.join(rows)))
+
+    lines.append('    return s1')
+
+    namespace = {}
+    exec(compile('\n'.join(lines), '<poseidon>', 'exec'), namespace)
+    return namespace['permutation']
@@ -0,0 +1,192 @@
+"""
+Numba kernel of the Poseidon permutation over Montgomery-form multi-limb integers.
+
+Field elements are stored as little-endian arrays of 32-bit words kept in uint64 lanes, so that every
+word product plus carries of the CIOS Montgomery multiplication fits into 64 bits.
+"""
+import numpy as np
+from numba import njit
+
+WORD_BITS = 32
+WORD_MASK = np.uint64((1 << WORD_BITS) - 1)
+WORD_SHIFT = np.uint64(WORD_BITS)
+
+
+def limb_count(p):
+    """
+    :param int p: The prime field modulus.
+    :return: Number of 32-bit words needed to store elements of the field.
+    :rtype int:
+    """
+    return (p.bit_length() + WORD_BITS - 1) // WORD_BITS
+
+
+def to_limbs(x, n):
+    """
+    Convert python int to array of n 32-bit words (little-endian) of type uint64.
+    """
+    return np.frombuffer(x.to_bytes(4 * n, 'little'), dtype='<u4').astype(np.uint64)
+
+
+def from_limbs(limbs):
+    """
+    Convert array of 32-bit words (little-endian) to python int.
+    """
+    return int.from_bytes(limbs.astype('<u4').tobytes(), 'little')
+
+
+def montgomery_params(p):
+    """
+    :param int p: The prime field modulus.
+    :return: Number of words n, R = 2^(32*n) mod p, R^-1 mod p and -p^-1 mod 2^32.
+    :rtype int, int, int, int:
+    """
+    n = limb_count(p)
+    r = (1 << (WORD_BITS * n)) % p
+    r_inv = pow(r, -1, p)
+    p_inv = (-pow(p, -1, 1 << WORD_BITS)) % (1 << WORD_BITS)
+    return n, r, r_inv, p_inv
+
+
+def pack(values, p, r, n):
+    """
+    Convert nested lists of field elements to Montgomery form array with trailing dimension of n words.
+    """
+    arr = np.asarray(values, dtype=object)
+    flat = [to_limbs(int(x) * r % p, n) for x in arr.ravel()]
+    return np.stack(flat).reshape(arr.shape + (n,))
+
+
+@njit(cache=True)
+def _geq(a, p, n):
+    for j in range(n - 1, -1, -1):
+        if a[j] != p[j]:
+            return a[j] > p[j]
+    return True
+
+
+@njit(cache=True)
+def _sub_in_place(a, p, n):
+    borrow = np.uint64(0)
+    for j in range(n):
+        rhs = p[j] + borrow
+        if a[j] >= rhs:
+            a[j] = a[j] - rhs
+            borrow = np.uint64(0)
+        else:
+            a[j] = a[j] + (WORD_MASK + np.uint64(1)) - rhs
+            borrow = np.uint64(1)
+
+
+@njit(cache=True)
+def add_mod(a, b, p, out):
+    n = p.shape[0]
+    carry = np.uint64(0)
+    for j in range(n):
+        s = a[j] + b[j] + carry
+        out[j] = s & WORD_MASK
+        carry = s >> WORD_SHIFT
+    if carry != 0 or _geq(out, p, n):
+        _sub_in_place(out, p, n)
+
+
+@njit(cache=True)
+def mont_mul(a, b, p, p_inv, out, scratch):
+    """
+    CIOS Montgomery multiplication: out = a * b * R^-1 mod p.
+    scratch must hold n + 2 words.
+    """
+    n = p.shape[0]
+    for j in range(n + 2):
+        scratch[j] = np.uint64(0)
+    for i in range(n):
+        c = np.uint64(0)
+        for j in range(n):
+            s = scratch[j] + a[j] * b[i] + c
+            scratch[j] = s & WORD_MASK
+            c = s >> WORD_SHIFT
+        s = scratch[n] + c
+        scratch[n] = s & WORD_MASK
+        scratch[n + 1] = s >> WORD_SHIFT
+
+        m = (scratch[0] * np.uint64(p_inv)) & WORD_MASK
+        s = scratch[0] + m * p[0]
+        c = s >> WORD_SHIFT
+        for j in range(1, n):
+            s = scratch[j] + m * p[j] + c
+            scratch[j - 1] = s & WORD_MASK
+            c = s >> WORD_SHIFT
+        s = scratch[n] + c
+        scratch[n - 1] = s & WORD_MASK
+        scratch[n] = scratch[n + 1] + (s >> WORD_SHIFT)
+
+    for j in range(n):
+        out[j] = scratch[j]
+    if scratch[n] != 0 or _geq(out, p, n):
+        _sub_in_place(out, p, n)
+
+
+@njit(cache=True)
+def _s_box(x, alpha, p, p_inv, one, acc, base, tmp, scratch):
+    n = p.shape[0]
+    for j in range(n):
+        acc[j] = one[j]
+        base[j] = x[j]
+    e = alpha
+    while e > 0:
+        if e & 1:
+            mont_mul(acc, base, p, p_inv, tmp, scratch)
+            acc[:] = tmp
+        e >>= 1
+        if e > 0:
+            mont_mul(base, base, p, p_inv, tmp, scratch)
+            base[:] = tmp
+    for j in range(n):
+        x[j] = acc[j]
+
+
+@njit(cache=True)
+def permutation(state, rc, mds, p, p_inv, one, alpha, half_full_round, partial_round):
+    """
+    Poseidon permutation on Montgomery-form state of shape (t, n), updated in place.
+
+    :param state: Array of shape (t, n).
+    :param rc: Round constants of shape (full_round + partial_round, t, n).
+    :param mds: MDS matrix of shape (t, t, n).
+    :param p: Modulus of shape (n,).
+    :param p_inv: -p^-1 mod 2^32.
+    :param one: R mod p of shape (n,), i.e. 1 in Montgomery form.
+    :param alpha: The power of S-box.
+    :param half_full_round: Half the number of full rounds.
+    :param partial_round: Number of partial rounds.
+    """
+    t = state.shape[0]
+    n = p.shape[0]
+    acc = np.zeros(n, dtype=np.uint64)
+    base = np.zeros(n, dtype=np.uint64)
+    tmp = np.zeros(n, dtype=np.uint64)
+    scratch = np.zeros(n + 2, dtype=np.uint64)
+    new_state = np.zeros((t, n), dtype=np.uint64)
+
+    for r in range(rc.shape[0]):
+        # add round constants, apply s-box
+        for i in range(t):
+            add_mod(state[i], rc[r, i], p, tmp)
+            state[i, :] = tmp
+        if half_full_round <= r < half_full_round + partial_round:
+            _s_box(state[0], alpha, p, p_inv, one, acc, base, tmp, scratch)
+        else:
+            for i in range(t):
+                _s_box(state[i], alpha, p, p_inv, one, acc, base, tmp, scratch)
+
+        # apply MDS matrix
+        for i in range(t):
+            for j in range(n):
+                acc[j] = np.uint64(0)
+            for k in range(t):
+                mont_mul(mds[i, k], state[k], p, p_inv, tmp, scratch)
+                add_mod(acc, tmp, p, base)
+                acc[:] = base
+            new_state[i, :] = acc
+        state[:, :] = new_state
+
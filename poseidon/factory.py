@@ -0,0 +1,31 @@
+import functools
+from typing import Optional
+
+from .hash import Poseidon, OptimizedPoseidon, HashType
+
+
+@functools.lru_cache(maxsize=32)
+def get_poseidon(p, security_level, alpha, input_rate, t, full_round: Optional[int] = None,
+                 partial_round: Optional[int] = None, prime_bit_len: Optional[int] = None,
+                 h_type: Optional[HashType] = None):
+    """
+    Return a ready-to-run hash instance, generating its round numbers, round constants and MDS matrix only once
+    per set of parameters. `run_hash` resets the inner state on every call, so the cached instance can be reused.
+
+    :param int p: The prime field modulus.
+    :param int security_level: The security level measured in bits. Denoted `M` in the Poseidon paper.
+    :param int alpha: The power of S-box.
+    :param int input_rate: The size of input.
+    :param int t: The size of Poseidon's inner state.
+    :param int full_round: (optional) Number of full rounds. If parameter is empty it will be calculated.
+    :param int partial_round: (optional) Number of partial rounds. If parameter is empty it will be calculated.
+    :param int prime_bit_len: (optional) The number of bits of the Poseidon prime field modulus.
+    :param HashType h_type: (optional) Type of input data. If set, an `OptimizedPoseidon` is returned,
+        otherwise a `Poseidon`.
+    :return: Poseidon or OptimizedPoseidon instance.
+    """
+    if h_type is not None:
+        return OptimizedPoseidon(h_type, p, security_level, alpha, input_rate, t, full_round=full_round,
+                                 partial_round=partial_round, prime_bit_len=prime_bit_len)
+    return Poseidon(p, security_level, alpha, input_rate, t, full_round=full_round, partial_round=partial_round,
+                    prime_bit_len=prime_bit_len)
@@ -1,4 +1,5 @@
 import enum
+import functools
 import numpy as np
 import galois
 
@@ -7,6 +8,8 @@ from typing import Optional
 
 from . import round_constants as rc
 from . import round_numbers as rn
+from . import _numba_kernel as nk
+from . import _codegen as cg
 
 
 class HashType(enum.Enum):
@@ -83,40 +86,90 @@ class Poseidon:
         if rc_list is not None:
             if len(rc_list) != self.t * (self.full_round + self.partial_round):
                 raise ValueError('Invalid number of round constants')
-            self.rc_field = self.field_p([int(x, 16) for x in rc_list])
+            self.rc_field = self.field_p(rc.hex_list_to_ints(rc_list))
         else:
             self.rc_field = rc.calc_round_constants(self.t, self.full_round, self.partial_round, self.p, self.field_p,
                                                     self.alpha, self.prime_bit_len)
 
+        # one row of t round constants per round
+        self.rc_per_round = self.rc_field.reshape((self.full_round + self.partial_round, self.t))
+        self.first_full_rc = self.rc_per_round[:self.half_full_round]
+        self.partial_rc = self.rc_per_round[self.half_full_round:self.half_full_round + self.partial_round]
+        self.last_full_rc = self.rc_per_round[self.half_full_round + self.partial_round:]
+
+        # inner state buffer, updated in place by the rounds
         self.state = self.field_p.Zeros(self.t)
-        self.rc_counter = 0
 
-    def s_box(self, element):
-        return element ** self.alpha
+    # The constants of run_hash_fast and run_hash_jit are only prepared on the first call of these methods
 
-    def full_rounds(self):
-        for r in range(0, self.half_full_round):
-            # add round constants, apply s-box
-            for i in range(0, self.t):
-                self.state[i] = self.state[i] + self.rc_field[self.rc_counter]
-                self.rc_counter += 1
+    @functools.cached_property
+    def mds_int(self):
+        return tuple(tuple(int(x) for x in row) for row in self.mds_matrix)
 
-                self.state[i] = self.s_box(self.state[i])
+    @functools.cached_property
+    def rc_int(self):
+        return tuple(tuple(int(x) for x in row) for row in self.rc_per_round)
 
-            # apply MDS matrix
-            self.state = np.matmul(self.mds_matrix, self.state)
+    @functools.cached_property
+    def fast_permutation(self):
+        return cg.generate(self.p, self.t, self.alpha, self.mds_int, self.rc_int, self.half_full_round,
+                           self.partial_round)
 
-    def partial_rounds(self):
-        for r in range(0, self.partial_round):
-            # add round constants, apply s-box
-            for i in range(0, self.t):
-                self.state[i] = self.state[i] + self.rc_field[self.rc_counter]
-                self.rc_counter += 1
+    @functools.cached_property
+    def mont_constants(self):
+        """
+        :return: Number of words n, R = 2^(32*n) mod p, R^-1 mod p, -p^-1 mod 2^32, and in Montgomery form limbs:
+            p, 1 (R mod p), the round constants and the MDS matrix.
+        :rtype tuple:
+        """
+        n, r, r_inv, p_inv = nk.montgomery_params(self.p)
+        return (n, r, r_inv, p_inv, nk.to_limbs(self.p, n), nk.to_limbs(r, n), nk.pack(self.rc_int, self.p, r, n),
+                nk.pack(self.mds_int, self.p, r, n))
 
-            self.state[0] = self.s_box(self.state[0])
+    @functools.cached_property
+    def batch_mds_matrix(self):
+        # the batched rounds keep one state per row, so the MDS matrix is applied from the right
+        return self.mds_matrix.T
 
-            # apply MDS matrix
-            self.state = np.matmul(self.mds_matrix, self.state)
+    def s_box(self, element):
+        return element ** self.alpha
+
+    def apply_mds(self, state):
+        return np.matmul(self.mds_matrix, state)
+
+    def full_rounds(self, round_constants):
+        state, alpha, apply_mds = self.state, self.alpha, self.apply_mds
+        for rc_block in round_constants:
+            # add round constants, apply s-box, apply MDS matrix
+            np.add(state, rc_block, out=state)
+            np.power(state, alpha, out=state)
+            state[:] = apply_mds(state)
+
+    def partial_rounds(self, round_constants):
+        state, s_box, apply_mds = self.state, self.s_box, self.apply_mds
+        for rc_block in round_constants:
+            # add round constants, apply s-box to the first element, apply MDS matrix
+            np.add(state, rc_block, out=state)
+            state[0] = s_box(state[0])
+            state[:] = apply_mds(state)
+
+    def full_rounds_many(self, states, round_constants):
+        batch_mds_matrix = self.batch_mds_matrix
+        for rc_block in round_constants:
+            # add round constants, apply s-box, apply MDS matrix to every state
+            np.add(states, rc_block, out=states)
+            np.power(states, self.alpha, out=states)
+            states = states @ batch_mds_matrix
+        return states
+
+    def partial_rounds_many(self, states, round_constants):
+        batch_mds_matrix = self.batch_mds_matrix
+        for rc_block in round_constants:
+            # add round constants, apply s-box to the first column, apply MDS matrix to every state
+            np.add(states, rc_block, out=states)
+            states[:, 0] = self.s_box(states[:, 0])
+            states = states @ batch_mds_matrix
+        return states
 
     def run_hash(self, input_vec: list):
         """
@@ -126,20 +179,80 @@ class Poseidon:
         """
         if len(input_vec) < self.t:
             input_vec.extend([0] * (self.t - len(input_vec)))
-        self.state = self.field_p(input_vec)
-        self.rc_counter = 0
+        self.state[:] = input_vec
 
         # First full rounds
-        self.full_rounds()
+        self.full_rounds(self.first_full_rc)
 
         # Middle partial rounds
-        self.partial_rounds()
+        self.partial_rounds(self.partial_rc)
 
         # Last full rounds
-        self.full_rounds()
+        self.full_rounds(self.last_full_rc)
 
         return self.state[1]
 
+    def run_hash_many(self, inputs):
+        """
+        Hash many inputs at once. The states are kept in one array of size N*t, so every round is a single
+        vectorized operation over all of them.
+
+        :param inputs: Sequence of N inputs of size at most t. Each row is one input, padded with zeros up to size t.
+        :return: Array of N output field elements, empty for N = 0.
+        """
+        if any(len(input_vec) > self.t for input_vec in inputs):
+            raise ValueError('Invalid length of input data')
+        if len(inputs) == 0:
+            return self.field_p.Zeros(0)
+        states = self.field_p([[*input_vec, *[0] * (self.t - len(input_vec))] for input_vec in inputs])
+
+        # First full rounds
+        states = self.full_rounds_many(states, self.first_full_rc)
+
+        # Middle partial rounds
+        states = self.partial_rounds_many(states, self.partial_rc)
+
+        # Last full rounds
+        states = self.full_rounds_many(states, self.last_full_rc)
+
+        return states[:, 1]
+
+    def run_hash_fast(self, input_vec: list):
+        """
+        Same permutation as `run_hash`, but computed on python ints with explicit reduction modulo `p`
+        instead of galois field arrays. The rounds are unrolled into code generated for this instance,
+        with the MDS matrix and the round constants inlined.
+
+        :param list input_vec: Input elements, padded with zeros up to size t.
+        :return: Output element of type int.
+        :rtype int:
+        """
+        if len(input_vec) > self.t:
+            raise ValueError('Invalid length of input data')
+
+        state = [int(x) % self.p for x in input_vec] + [0] * (self.t - len(input_vec))
+        return self.fast_permutation(*state)
+
+    def run_hash_jit(self, input_vec: list):
+        """
+        Same permutation as `run_hash`, but computed by a Numba compiled kernel on Montgomery form limbs.
+        The first call pays the compilation cost.
+
+        :param list input_vec: Input elements, padded with zeros up to size t.
+        :return: Output element of type int.
+        :rtype int:
+        """
+        if len(input_vec) > self.t:
+            raise ValueError('Invalid length of input data')
+
+        n, r, r_inv, p_inv, mont_p, mont_one, mont_rc, mont_mds = self.mont_constants
+        state = [int(x) % self.p for x in input_vec] + [0] * (self.t - len(input_vec))
+        mont_state = nk.pack(state, self.p, r, n)
+        nk.permutation(mont_state, mont_rc, mont_mds, mont_p, p_inv, mont_one, self.alpha, self.half_full_round,
+                       self.partial_round)
+
+        return nk.from_limbs(mont_state[1]) * r_inv % self.p
+
 
 class OptimizedPoseidon(Poseidon):
     def __init__(self, h_type, p, security_level, alpha, input_rate, t,
@@ -172,11 +285,33 @@ class OptimizedPoseidon(Poseidon):
         self.hash_type = h_type
 
         print("Initialize optimized RC")
-        split_rc = [self.field_p(x.tolist()) for x in np.array_split(self.rc_field, len(self.rc_field) / self.t)]
-        self.opt_rc_field = rc.optimized_rc(split_rc, self.half_full_round, self.partial_round, self.mds_matrix)
+        self.opt_rc_field = self.field_p(rc.optimized_rc(self.rc_per_round, self.half_full_round, self.partial_round,
+                                                         self.mds_matrix))
+        # layout: t (pre-round) | t * (half_full_round - 1) (first full rounds) | t (pre-partial) |
+        # partial_round (partial rounds) | t * (half_full_round - 1) (last full rounds)
+        hfr, pr = self.half_full_round - 1, self.partial_round
+        offset = self.t
+        self.pre_rc = self.opt_rc_field[:offset]
+        self.opt_first_full_rc = self.opt_rc_field[offset:offset + hfr * self.t].reshape((hfr, self.t))
+        offset += hfr * self.t
+        self.pre_partial_rc = self.opt_rc_field[offset:offset + self.t]
+        offset += self.t
+        self.opt_partial_rc = self.opt_rc_field[offset:offset + pr]
+        offset += pr
+        self.opt_last_full_rc = self.opt_rc_field[offset:offset + hfr * self.t].reshape((hfr, self.t))
         print("Initialize optimized MDS")
         self.pre_matrix, self.spase_matrices = rc.optimized_matrix(self.mds_matrix, self.partial_round, self.field_p)
 
+    @functools.cached_property
+    def mds_int(self):
+        # the optimized rounds apply state @ mds_matrix, the equivalent permutation of `Poseidon` uses the transpose
+        return tuple(tuple(int(x) for x in row) for row in self.mds_matrix.T)
+
+    @functools.cached_property
+    def batch_mds_matrix(self):
+        # the optimized rounds already apply the MDS matrix from the right, state @ mds_matrix
+        return self.mds_matrix
+
     def domain_separation(self, input_vec):
         """
 
@@ -194,25 +329,22 @@ class OptimizedPoseidon(Poseidon):
 
         return [domain_tag, *input_vec, *padding]
 
-    def full_rounds(self):
-        for r in range(0, self.half_full_round - 1):
-            # apply s-box, add round constants
-            for i in range(0, self.t):
-                self.state[i] = self.s_box(self.state[i])
-                self.state[i] = self.state[i] + self.opt_rc_field[self.rc_counter]
-                self.rc_counter += 1
-
-            self.state = np.dot(self.state, self.mds_matrix)
-
-    def partial_rounds(self):
-        for r in range(0, self.partial_round):
+    def full_rounds(self, round_constants):
+        state, alpha, mds_matrix = self.state, self.alpha, self.mds_matrix
+        for rc_block in round_constants:
+            # apply s-box, add round constants, apply MDS matrix
+            np.power(state, alpha, out=state)
+            np.add(state, rc_block, out=state)
+            state[:] = np.dot(state, mds_matrix)
+
+    def partial_rounds(self, round_constants):
+        state, s_box = self.state, self.s_box
+        for rc_element, sparse_matrix in zip(round_constants, self.spase_matrices):
             # apply s-box, add round constants
-            self.state[0] = self.s_box(self.state[0])
-            self.state[0] = self.state[0] + self.opt_rc_field[self.rc_counter]
-            self.rc_counter += 1
+            state[0] = s_box(state[0]) + rc_element
 
             # apply MDS matrix
-            self.state = np.dot(self.state, self.spase_matrices[r])
+            state[:] = np.dot(state, sparse_matrix)
 
     def run_hash(self, input_vec):
         """
@@ -222,34 +354,68 @@ class OptimizedPoseidon(Poseidon):
         """
         if len(input_vec) >= self.t:
             raise ValueError('Invalid length of input data')
-        self.rc_counter = 0
 
         st = self.domain_separation(input_vec)
-        self.state = self.field_p(st)
+        self.state[:] = st
 
         # add pre-round constant
-        for i in range(0, self.t):
-            self.state[i] = self.state[i] + self.opt_rc_field[self.rc_counter]
-            self.rc_counter += 1
+        np.add(self.state, self.pre_rc, out=self.state)
 
         # First full rounds
-        self.full_rounds()
+        self.full_rounds(self.opt_first_full_rc)
 
-        for i in range(0, self.t):
-            self.state[i] = self.s_box(self.state[i])
-            self.state[i] = self.state[i] + self.opt_rc_field[self.rc_counter]
-            self.rc_counter += 1
-        self.state = np.matmul(self.state, self.pre_matrix)
+        np.power(self.state, self.alpha, out=self.state)
+        np.add(self.state, self.pre_partial_rc, out=self.state)
+        self.state[:] = np.matmul(self.state, self.pre_matrix)
 
         # Middle partial rounds
-        self.partial_rounds()
+        self.partial_rounds(self.opt_partial_rc)
 
         # Last full rounds
-        self.full_rounds()
+        self.full_rounds(self.opt_last_full_rc)
 
         # do once for r = R - 1
-        for i in range(0, self.t):
-            self.state[i] = self.s_box(self.state[i])
-        self.state = np.matmul(self.state, self.mds_matrix)
+        np.power(self.state, self.alpha, out=self.state)
+        self.state[:] = np.matmul(self.state, self.mds_matrix)
 
         return self.state[1]
+
+    def run_hash_fast(self, input_vec):
+        """
+        Domain-separated hash computed with the python int permutation of `Poseidon.run_hash_fast`, generated
+        from the transposed MDS matrix, so the output matches `run_hash`.
+
+        :param input_vec:
+        :return: Output element of type int.
+        :rtype int:
+        """
+        if len(input_vec) >= self.t:
+            raise ValueError('Invalid length of input data')
+
+        return super().run_hash_fast(self.domain_separation(input_vec))
+
+    def run_hash_jit(self, input_vec):
+        """
+        Domain-separated hash computed with the Numba kernel of `Poseidon.run_hash_jit`. The kernel gets the MDS
+        matrix packed from `mds_int`, i.e. transposed, so the output matches `run_hash`.
+
+        :param input_vec:
+        :return: Output element of type int.
+        :rtype int:
+        """
+        if len(input_vec) >= self.t:
+            raise ValueError('Invalid length of input data')
+
+        return super().run_hash_jit(self.domain_separation(input_vec))
+
+    def run_hash_many(self, inputs):
+        """
+        Domain-separated hashes of many inputs computed with the batched permutation of `Poseidon.run_hash_many`.
+
+        :param inputs: Sequence of N inputs of size less than t. Each row is one input.
+        :return: Array of N output field elements, empty for N = 0.
+        """
+        if any(len(input_vec) >= self.t for input_vec in inputs):
+            raise ValueError('Invalid length of input data')
+
+        return super().run_hash_many([self.domain_separation(list(input_vec)) for input_vec in inputs])
@@ -1,6 +1,31 @@
+import functools
 from copy import deepcopy
+from itertools import repeat
 import numpy as np
 
+# The Grain LFSR state b0, ..., b79 is kept in a single int with b0 as the most significant bit,
+# so bi is at bit position 79 - i.
+GRAIN_MASK = (1 << 80) - 1
+# The largest number of bits produced by one shift of the packed state: the new bits b80, ..., b(80 + m - 1) only
+# depend on b(62 + m - 1) and earlier bits, which are all part of the current state for m <= 18.
+GRAIN_STEP = 18
+# Output of the self-shrinking mode for every 6 bits (3 pairs) of the LFSR, the second bit of a pair is kept if
+# the first one is 1.
+SHRINK_TABLE = [''.join(b for a, b in zip(bits[::2], bits[1::2]) if a == '1')
+                for bits in (format(x, '06b') for x in range(64))]
+
+
+def hex_list_to_ints(hex_list):
+    """
+    Convert list of elements in hex representation to list of ints. The loop runs inside `map`, without a python
+    level call per element.
+
+    :param list hex_list: List of elements in hex.
+    :return: List of ints.
+    :rtype list:
+    """
+    return list(map(int, hex_list, repeat(16, len(hex_list))))
+
 
 def get_field_matrix_from_hex_matrix(field_p, mds_matrix):
     """
@@ -10,27 +35,20 @@ def get_field_matrix_from_hex_matrix(field_p, mds_matrix):
     :param list mds_matrix: 2-dim array of size t*t. Consist of elements in hex.
     :return: 2-dim array of size t*t. Consist of field elements.
     """
-    n = len(mds_matrix)
-    mds_matrix_field = field_p.Zeros((n, n))
-    for i in range(0, n):
-        for j in range(0, n):
-            mds_matrix_field[i, j] = field_p(int(mds_matrix[i][j], 16))
-    return mds_matrix_field
+    hex_to_int = np.frompyfunc(lambda x: int(x, 16), 1, 1)
+    return field_p(hex_to_int(np.asarray(mds_matrix, dtype=object)))
 
 
 def get_hex_matrix_from_field_matrix(m, size):
     """
     Help function for tests. Convert matrix in field representation to matrix in hex representation.
+    Works on arrays of any shape, e.g. a stack of matrices is converted in one pass.
     :param m:
     :param size:
     :return:
     """
-    n = len(m)
-    hex_matrix = [['' for _ in range(n)] for _ in range(n)]
-    for i in range(0, n):
-        for j in range(0, n):
-            hex_matrix[i][j] = '0x{0:0{1}x}'.format(int(m[i][j]), size)
-    return hex_matrix
+    int_to_hex = np.frompyfunc(lambda x: '0x{0:0{1}x}'.format(int(x), size), 1, 1)
+    return int_to_hex(np.asarray(m, dtype=object)).tolist()
 
 
 def init_state_for_grain(alpha, p, prime_bit_len, t, full_round, partial_round):
@@ -53,10 +71,9 @@ def init_state_for_grain(alpha, p, prime_bit_len, t, full_round, partial_round):
     :param int t: The size of Poseidon's inner state
     :param int full_round: Number of full rounds
     :param int partial_round: Number of partial rounds
-    :return: Initialized state with 80 elements of type int.
-    :rtype list:
+    :return: Initialized state packed into 80 bits, b0 is the most significant bit.
+    :rtype int:
     """
-    init_state = []
     # Choice of encoding for alpha, consistent with filecoin documentation except else
     if alpha == 3:
         exp_flag = 0
@@ -67,15 +84,8 @@ def init_state_for_grain(alpha, p, prime_bit_len, t, full_round, partial_round):
     else:
         exp_flag = 3
 
-    init_state += [int(_) for _ in (bin(p % 2)[2:].zfill(2))]
-    init_state += [int(_) for _ in (bin(exp_flag)[2:].zfill(4))]
-    init_state += [int(_) for _ in (bin(prime_bit_len)[2:].zfill(12))]
-    init_state += [int(_) for _ in (bin(t)[2:].zfill(12))]
-    init_state += [int(_) for _ in (bin(full_round)[2:].zfill(10))]
-    init_state += [int(_) for _ in (bin(partial_round)[2:].zfill(10))]
-    init_state += [int(1)] * 30
-
-    return init_state
+    return ((p % 2) << 78 | exp_flag << 74 | prime_bit_len << 62 | t << 50 | full_round << 40 | partial_round << 30
+            | (1 << 30) - 1)
 
 
 def calc_round_constants(t, full_round, partial_round, p, field_p, alpha, prime_bit_len):
@@ -99,31 +109,46 @@ def calc_round_constants(t, full_round, partial_round, p, field_p, alpha, prime_
     :param int full_round: Number of full rounds
     :param int partial_round: Number of partial rounds
     :param int p: The prime field modulus.
-    :param field_p: A field field_p of type galois.GF(p).
+    :param field_p: A field field_p of type galois.GF(p). If `None`, the constants are returned as python ints.
     :param int alpha: The power of S-box.
     :param int prime_bit_len: The number of bits of the Poseidon prime field modulus.
-    :return: List of field elements of size t * (full_round + partial_round).
+    :return: Array of field elements (or list of ints) of size t * (full_round + partial_round).
         Each t element corresponds to one round constant.
-    :rtype list:
+    :rtype galois.FieldArray or list:
     """
     rc_number = t * (full_round + partial_round)
 
     state = init_state_for_grain(alpha, p, prime_bit_len, t, full_round, partial_round)
-    rc_field = []
+    rc_ints = []
     # Discard first 160 output bits:
-    for _ in range(0, 160):
-        new_bit = state[62] ^ state[51] ^ state[38] ^ state[23] ^ state[13] ^ state[0]
-        state.pop(0)
-        state.append(new_bit)
+    for _ in range(0, 160, 16):
+        state, _ = grain_shift(state, 16)
 
-    while len(rc_field) < rc_number:
-        state, bits = calc_next_bits(state, prime_bit_len)
+    while len(rc_ints) < rc_number:
+        state, rc_int = calc_next_bits(state, prime_bit_len)
 
-        rc_int = int("".join(str(i) for i in bits), 2)
         if rc_int < p:
-            rc_field.append(field_p(rc_int))
+            rc_ints.append(rc_int)
 
-    return rc_field
+    if field_p is None:
+        return rc_ints
+    return field_p(rc_ints)
+
+
+def grain_shift(state, m):
+    """
+    Shift the LFSR by m bits at once. Each new bit bi+80 = bi+62 ⊕ bi+51 ⊕ bi+38 ⊕ bi+23 ⊕ bi+13 ⊕ bi, so
+    for m <= GRAIN_STEP all of them are computed with one shift per tap of the packed state.
+
+    :param int state: Current LFSR state packed into 80 bits, b0 is the most significant bit.
+    :param int m: The number of new bits, at most GRAIN_STEP.
+    :return: New LFSR state and the m new bits, the first one as the most significant bit.
+    :rtype int, int:
+    """
+    # tap bi+j is at bit position 79 - j, shifting it by 80 - j - m lines the m taps up with the m new bits
+    new_bits = ((state >> (80 - m)) ^ (state >> (67 - m)) ^ (state >> (57 - m)) ^ (state >> (42 - m))
+                ^ (state >> (29 - m)) ^ (state >> (18 - m))) & ((1 << m) - 1)
+    return ((state << m) | new_bits) & GRAIN_MASK, new_bits
 
 
 def calc_next_bits(state, prime_bit_len):
@@ -133,25 +158,22 @@ def calc_next_bits(state, prime_bit_len):
     - Update the bits using bi+80 = bi+62 ⊕ bi+51 ⊕ bi+38 ⊕ bi+23 ⊕ bi+13 ⊕ bi.
     - Evaluate bits in pairs: If the first bit is a 1, output the second bit. If it is a 0, discard the second bit.
 
-    :param list state: Current LFSR state
+    Every pair gives at most one output bit, so shifting by twice the number of missing bits never consumes pairs
+    of the next number. The shifted bits are padded to GRAIN_STEP with 00 pairs, which give no output.
+
+    :param int state: Current LFSR state packed into 80 bits, b0 is the most significant bit.
     :param int prime_bit_len: The number of bits of the Poseidon prime field modulus.
     :return: New LFSR state after shifts and new field_size number generated.
-    :rtype list, list:
+    :rtype int, int:
     """
-    bits = []
+    bits = ''
     while len(bits) < prime_bit_len:
-        new_bit_1 = state[62] ^ state[51] ^ state[38] ^ state[23] ^ state[13] ^ state[0]
-        state.pop(0)
-        state.append(new_bit_1)
-
-        new_bit_2 = state[62] ^ state[51] ^ state[38] ^ state[23] ^ state[13] ^ state[0]
-        state.pop(0)
-        state.append(new_bit_2)
-
-        if new_bit_1 == 1:
-            bits.append(new_bit_2)
+        m = 2 * min(GRAIN_STEP // 2, prime_bit_len - len(bits))
+        state, new_bits = grain_shift(state, m)
+        new_bits <<= GRAIN_STEP - m
+        bits += SHRINK_TABLE[new_bits >> 12] + SHRINK_TABLE[(new_bits >> 6) & 63] + SHRINK_TABLE[new_bits & 63]
 
-    return state, bits
+    return state, int(bits, 2)
 
 
 def mds_matrix_generator(field_p, t):
@@ -164,15 +186,41 @@ def mds_matrix_generator(field_p, t):
     :return: 2-dim array of size t*t consist of filed elements
     :rtype:
     """
-    x_vec = [field_p(ele) for ele in range(0, t)]
-    y_vec = [field_p(ele) for ele in range(t, 2 * t)]
+    return _mds_matrix(field_p, t).copy()
 
-    mds_matrix = field_p.Zeros((t, t))
-    for i in range(t):
-        for j in range(t):
-            mds_matrix[i, j] = (x_vec[i] + y_vec[j]) ** (-1)
 
-    return mds_matrix
+@functools.lru_cache(maxsize=8)
+def _mds_matrix(field_p, t):
+    x_vec = field_p(np.arange(0, t))
+    y_vec = field_p(np.arange(t, 2 * t))
+
+    return (x_vec[:, None] + y_vec[None, :]) ** (-1)
+
+
+def gf_inv_small(m, field_p):
+    """
+    Invert a small square matrix over the field by Gauss-Jordan elimination on the augmented matrix [m | I].
+    Each elimination step is a single vector operation over the whole augmented matrix.
+
+    :param 2-dim array m: Square matrix of field elements.
+    :param field_p: A field field_p of type galois.GF(p).
+    :return: 2-dim array equal to the inverse of m.
+    """
+    n = len(m)
+    aug = np.concatenate((m, field_p.Identity(n)), axis=1)
+    for col in range(n):
+        nonzero = np.nonzero(aug[col:, col])[0]
+        if len(nonzero) == 0:
+            raise np.linalg.LinAlgError('Matrix is singular')
+        pivot = col + nonzero[0]
+        if pivot != col:
+            aug[[col, pivot]] = aug[[pivot, col]]
+
+        aug[col] = aug[col] / aug[col, col]
+        factors = aug[:, col].copy()
+        factors[col] = 0
+        aug = aug - np.outer(factors, aug[col])
+    return aug[:, n:]
 
 
 def optimized_rc(rc, half_full_round, partial_round, mds_matrix):
@@ -183,7 +231,7 @@ def optimized_rc(rc, half_full_round, partial_round, mds_matrix):
 
     Each full round is associated with t field elements, while each partial round is associated with one field element.
 
-    :param list rc: List of pre-generated round constants of size full_round + partial_round.
+    :param rc: Pre-generated round constants of size full_round + partial_round, each row of size t.
     :param int half_full_round: half the number of full rounds
     :param int partial_round: Number of partial rounds
     :param mds_matrix: Pre-generated MDS matrix of size t*t consist of filed elements
@@ -191,14 +239,13 @@ def optimized_rc(rc, half_full_round, partial_round, mds_matrix):
     :rtype list:
     """
     opt_rc_field = []
-    m_inv = np.linalg.inv(mds_matrix)
+    m_inv = gf_inv_small(mds_matrix, type(mds_matrix))
 
     # pre round constant
     opt_rc_field.extend(rc[0])
-    # half_full_round - 2 constants for full rounds
-    for r in range(1, half_full_round):
-        buf = np.dot(rc[r], m_inv)
-        opt_rc_field.extend(buf)
+    # half_full_round - 1 constants for full rounds
+    if half_full_round > 1:
+        opt_rc_field.extend((np.stack(rc[1:half_full_round]) @ m_inv).ravel())
 
     partial_const = []
     final_round = half_full_round + partial_round
@@ -216,8 +263,8 @@ def optimized_rc(rc, half_full_round, partial_round, mds_matrix):
 
     # half_full_round - 1 constants for full rounds
     start = half_full_round + partial_round
-    for r in range(1, half_full_round):
-        opt_rc_field.extend(rc[start + r] @ m_inv)
+    if half_full_round > 1:
+        opt_rc_field.extend((np.stack(rc[start + 1:start + half_full_round]) @ m_inv).ravel())
 
     return opt_rc_field
 
@@ -231,16 +278,26 @@ def optimized_matrix(mds_matrix, partial_round, field_p):
     :param int partial_round: Number of partial rounds
     :param field_p: A field field_p of type galois.GF(p).
     :return: 2-dim array correspond to pre-sparse matrix of size t*t
-        and list of 2-dim arrays correspond to sparce matrices each of which is of the size of t*t.
+        and 3-dim array of size partial_round*t*t, each of its t*t matrices correspond to one sparse matrix.
     """
-    sparse_matrices = []
+    # the factorization is deterministic, cache it by the matrix entries (arrays themselves are not hashable)
+    mds_rows = tuple(tuple(int(x) for x in row) for row in mds_matrix)
+    pre_matrix, sparse_matrices = _optimized_matrix(mds_rows, partial_round, field_p)
+    return pre_matrix.copy(), sparse_matrices.copy()
+
+
+@functools.lru_cache(maxsize=8)
+def _optimized_matrix(mds_rows, partial_round, field_p):
+    t = len(mds_rows)
+    mds_matrix = field_p([list(row) for row in mds_rows])
+    sparse_matrices = field_p.Zeros((partial_round, t, t))
     m = deepcopy(mds_matrix)
     for r in range(0, partial_round):
         m_1, m_2 = sparse_factorize(m, field_p)
-        sparse_matrices.append(m_2)
+        # sparse matrices are produced from the last partial round backwards
+        sparse_matrices[partial_round - 1 - r] = m_2
         m = mds_matrix @ m_1
     pre_matrix = m
-    sparse_matrices.reverse()
 
     return pre_matrix, sparse_matrices
 
@@ -261,7 +318,7 @@ def sparse_factorize(m, field_p):
 
     w = m[1:, 0]
     m_cap = m[1:, 1:]
-    m_inv = np.linalg.inv(m_cap)
+    m_inv = gf_inv_small(m_cap, field_p)
     w_cap = m_inv @ w
 
     m_2 = field_p.Identity(len(m))
@@ -19,6 +19,7 @@ setup(
         'pytest~=7.1.2',
         'galois~=0.3.6',
         'numpy>=1.18.4',
+        'numba>=0.55',
         'setuptools>=42.0',
     ],
     keywords=['Hash Function', 'Cryptography'],
@@ -0,0 +1,17 @@
+import galois
+import pytest as pytest
+
+
+@pytest.fixture(scope="session")
+def gf():
+    """
+    Field construction for a large prime is expensive, build each galois.GF(prime) once per test session.
+    """
+    cache = {}
+
+    def field(prime):
+        if prime not in cache:
+            cache[prime] = galois.GF(prime)
+        return cache[prime]
+
+    return field
@@ -0,0 +1,20 @@
+import pytest as pytest
+
+import poseidon
+
+
+@pytest.mark.parametrize("hash_type, t, alpha, prime, input_rate, security_level", [
+    (None, 3, 3, poseidon.prime_64, 2, 128),
+    (poseidon.HashType.MERKLETREE, 3, 3, poseidon.prime_64, 2, 128),
+])
+def test_get_poseidon(hash_type, t, alpha, prime, input_rate, security_level):
+    instance = poseidon.get_poseidon(prime, security_level, alpha, input_rate, t, h_type=hash_type)
+    assert instance is poseidon.get_poseidon(prime, security_level, alpha, input_rate, t, h_type=hash_type)
+
+    # hash twice with the cached instance, the second time its inner state is already used
+    for input_vec in ([x for x in range(0, input_rate)], [x + input_rate for x in range(0, input_rate)]):
+        if hash_type is None:
+            fresh = poseidon.Poseidon(prime, security_level, alpha, input_rate, t)
+        else:
+            fresh = poseidon.OptimizedPoseidon(hash_type, prime, security_level, alpha, input_rate, t)
+        assert instance.run_hash(list(input_vec)) == fresh.run_hash(list(input_vec))
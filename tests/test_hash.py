@@ -1,4 +1,5 @@
 import pytest as pytest
+import numpy as np
 
 import poseidon
 
@@ -10,6 +11,7 @@ output_255 = "0x65ebf8671739eeb11fb217f2d5c5bf4a0c3f210e3f3cd3b08b5db75675d797f7
 
 
 # Compare with reference implementation https://extgit.iaik.tugraz.at/krypto/hadeshash
+@pytest.mark.slow
 @pytest.mark.parametrize("t ,full_round, partial_round, alpha, prime, input_rate, security_level, rc, mds, output", [
     (3, 8, 57, 5, poseidon.prime_254, 2, 128, poseidon.round_constants_254, poseidon.matrix_254,
      output_254),
@@ -23,8 +25,14 @@ def test_not_optimized_poseidon(t, full_round, partial_round, alpha, prime, inpu
     input_vec = [x for x in range(0, t)]
     actual = instance.run_hash(input_vec)
     assert int(output, 16) == int(actual)
+    assert int(output, 16) == instance.run_hash_fast(input_vec)
+    assert int(output, 16) == instance.run_hash_jit(input_vec)
+    reversed_vec = input_vec[::-1]
+    assert np.array_equal(instance.run_hash_many([input_vec, reversed_vec]),
+                          [actual, instance.run_hash(list(reversed_vec))])
 
 
+@pytest.mark.slow
 @pytest.mark.parametrize("hash_type, t ,full_round, partial_round, alpha, prime, input_rate, security_level, rc, mds", [
     (poseidon.HashType.CONSTINPUTLEN, 4, 8, 56, 5, poseidon.prime_255, 3, 128, poseidon.round_constants_neptune,
      poseidon.matrix_neptune),
@@ -42,3 +50,86 @@ def test_optimized_poseidon(hash_type, t, full_round, partial_round, alpha, prim
     actual_non_optimized = instance_non_optimized.run_hash(input_vec_opt)
 
     assert actual_optimized == actual_non_optimized
+    assert int(actual_optimized) == instance_optimized.run_hash_fast(input_vec)
+    assert int(actual_optimized) == instance_optimized.run_hash_jit(input_vec)
+    reversed_vec = input_vec[::-1]
+    actual_many = instance_optimized.run_hash_many([input_vec, reversed_vec])
+    assert np.array_equal(actual_many, [actual_optimized, instance_optimized.run_hash(list(reversed_vec))])
+
+
+@pytest.mark.parametrize("t ,full_round, partial_round, alpha, prime, input_rate, security_level, rc, mds", [
+    (9, 8, 41, 3, poseidon.prime_64, 8, 128, poseidon.round_constants_64, poseidon.matrix_64),
+])
+def test_generated_rc_poseidon(t, full_round, partial_round, alpha, prime, input_rate, security_level, rc, mds):
+    instance_generated = poseidon.Poseidon(prime, security_level, alpha, input_rate, t=t, full_round=full_round,
+                                           partial_round=partial_round, mds_matrix=mds)
+    instance = poseidon.Poseidon(prime, security_level, alpha, input_rate, t=t, full_round=full_round,
+                                 partial_round=partial_round, rc_list=rc, mds_matrix=mds)
+    input_vec = [x for x in range(0, t)]
+    assert instance_generated.run_hash(list(input_vec)) == instance.run_hash(list(input_vec))
+
+
+@pytest.mark.parametrize("hash_type, t ,full_round, partial_round, alpha, prime, input_rate, security_level, rc, mds", [
+    (None, 9, 8, 41, 3, poseidon.prime_64, 8, 128, poseidon.round_constants_64, poseidon.matrix_64),
+    (poseidon.HashType.MERKLETREE, 9, 8, 41, 3, poseidon.prime_64, 8, 128, poseidon.round_constants_64,
+     poseidon.matrix_64),
+])
+def test_run_hash_many(hash_type, t, full_round, partial_round, alpha, prime, input_rate, security_level, rc, mds):
+    if hash_type is None:
+        instance = poseidon.Poseidon(prime, security_level, alpha, input_rate, t=t, full_round=full_round,
+                                     partial_round=partial_round, rc_list=rc, mds_matrix=mds)
+    else:
+        instance = poseidon.OptimizedPoseidon(hash_type, prime, security_level, alpha, input_rate, t=t,
+                                              full_round=full_round, partial_round=partial_round, rc_list=rc,
+                                              mds_matrix=mds)
+    inputs = [[row * t + x for x in range(0, t - 1)] for row in range(0, 3)]
+    actual = instance.run_hash_many(inputs)
+    assert len(actual) == len(inputs)
+    for input_vec, output in zip(inputs, actual):
+        assert output == instance.run_hash(list(input_vec))
+
+    assert len(instance.run_hash_many([])) == 0
+    with pytest.raises(ValueError):
+        instance.run_hash_many([inputs[0], list(range(0, t + 1))])
+
+
+@pytest.mark.parametrize("t, alpha, prime, input_rate, security_level", [
+    (3, 3, poseidon.prime_64, 2, 128),
+    (3, 5, poseidon.prime_64, 2, 128),
+    (5, 3, poseidon.prime_64, 4, 128),
+    (5, 5, poseidon.prime_64, 4, 128),
+])
+def test_run_hash_fast(t, alpha, prime, input_rate, security_level):
+    instance = poseidon.Poseidon(prime, security_level, alpha, input_rate, t=t)
+    input_vec = [x for x in range(0, t)]
+    assert int(instance.run_hash(list(input_vec))) == instance.run_hash_fast(input_vec)
+
+
+@pytest.mark.parametrize("t ,full_round, partial_round, alpha, prime, input_rate, security_level, rc, mds", [
+    (9, 8, 41, 3, poseidon.prime_64, 8, 128, poseidon.round_constants_64, poseidon.matrix_64),
+])
+def test_invalid_input_length(t, full_round, partial_round, alpha, prime, input_rate, security_level, rc, mds):
+    instance = poseidon.Poseidon(prime, security_level, alpha, input_rate, t=t, full_round=full_round,
+                                 partial_round=partial_round, rc_list=rc, mds_matrix=mds)
+    input_vec = [x for x in range(0, t + 1)]
+    with pytest.raises(ValueError):
+        instance.run_hash_jit(input_vec)
+    with pytest.raises(ValueError):
+        instance.run_hash_fast(input_vec)
+    with pytest.raises(TypeError):
+        instance.fast_permutation(*input_vec)
+
+
+@pytest.mark.parametrize("hash_type, t ,full_round, partial_round, alpha, prime, input_rate, security_level, rc, mds", [
+    (poseidon.HashType.MERKLETREE, 9, 8, 41, 3, poseidon.prime_64, 8, 128, poseidon.round_constants_64,
+     poseidon.matrix_64),
+])
+def test_optimized_poseidon_non_symmetric_mds(hash_type, t, full_round, partial_round, alpha, prime, input_rate,
+                                              security_level, rc, mds):
+    instance = poseidon.OptimizedPoseidon(hash_type, prime, security_level, alpha, input_rate, t=t,
+                                          full_round=full_round, partial_round=partial_round, rc_list=rc,
+                                          mds_matrix=mds)
+    input_vec = [x for x in range(0, t - 1)]
+    actual = instance.run_hash(list(input_vec))
+    assert int(actual) == instance.run_hash_fast(input_vec)
+    assert int(actual) == instance.run_hash_jit(input_vec)
@@ -1,5 +1,4 @@
 import pytest as pytest
-import galois
 import functools
 import numpy as np
 
@@ -7,6 +6,12 @@ import poseidon.round_constants as rc
 import poseidon
 
 
+@functools.lru_cache(maxsize=None)
+def calc_round_constants(t, full_round, partial_round, prime, alpha, prime_bit_len):
+    # the Grain LFSR stream is deterministic in its parameters, generate each table once per session
+    return tuple(rc.calc_round_constants(t, full_round, partial_round, prime, None, alpha, prime_bit_len))
+
+
 @pytest.mark.parametrize("rc_expected, t ,full_round, partial_round, alpha, prime, prime_bit_len", [
     # references are generated using https://extgit.iaik.tugraz.at/krypto/hadeshash/-/blob/master/code/generate_parameters_grain.sage
     # sage generate_parameters_grain.sage 1 0 64 9 8 41 0xfffffffffffffeff
@@ -16,53 +21,68 @@ import poseidon
 
 ])
 def test_calc_round_constants(rc_expected, t, full_round, partial_round, alpha, prime, prime_bit_len):
-    field_p = galois.GF(prime)
-    rc_actual = rc.calc_round_constants(t, full_round, partial_round, prime, field_p, alpha, prime_bit_len)
-    print([hex(int(x)) for x in rc_actual])
+    rc_actual = calc_round_constants(t, full_round, partial_round, prime, alpha, prime_bit_len)
     assert len(rc_actual) == len(rc_expected) == t * (full_round + partial_round)
-    assert functools.reduce(lambda x, y: x and y, map(lambda p, q: int(p, 16) == int(q), rc_expected, rc_actual),
-                            True)
+    expected = np.array(rc.hex_list_to_ints(rc_expected), dtype=object)
+    actual = np.array(rc_actual, dtype=object)
+    assert np.array_equal(expected, actual)
 
 
+@pytest.mark.slow
 @pytest.mark.parametrize("t, prime, expected_matrix", [
     (4, poseidon.prime_255, poseidon.matrix_neptune),
 ])
-def test_mds_matrix(t, prime, expected_matrix):
-    field_p = galois.GF(prime)
+def test_mds_matrix(t, prime, expected_matrix, gf):
+    field_p = gf(prime)
     matrix = rc.mds_matrix_generator(field_p, t)
-    hex_matrix = rc.get_hex_matrix_from_field_matrix(matrix, 64)
+    int_matrix = np.asarray(matrix, dtype=object)
+    expected_int_matrix = np.array([rc.hex_list_to_ints(row) for row in expected_matrix], dtype=object)
 
-    assert np.array_equal(expected_matrix, hex_matrix)
+    assert np.array_equal(expected_int_matrix, int_matrix)
 
 
+@pytest.mark.slow
 @pytest.mark.parametrize("opt_rc_expected, rc_not_opt, half_full_round, partial_round, mds_matrix, prime, t", [
     (poseidon.optimized_round_constants_neptune, poseidon.round_constants_neptune, 4, 56, poseidon.matrix_neptune,
      poseidon.prime_255, 4),
 ])
-def test_optimized_rc(opt_rc_expected, rc_not_opt, half_full_round, partial_round, mds_matrix, prime, t):
-    field_p = galois.GF(prime)
+def test_optimized_rc(opt_rc_expected, rc_not_opt, half_full_round, partial_round, mds_matrix, prime, t, gf):
+    field_p = gf(prime)
 
     field_matrix = rc.get_field_matrix_from_hex_matrix(field_p, mds_matrix)
 
-    field_const = field_p([int(x, 16) for x in rc_not_opt])
-    split_rc = [field_p(x.tolist()) for x in np.array_split(field_const, len(field_const) / t)]
+    field_const = field_p(rc.hex_list_to_ints(rc_not_opt))
+    split_rc = field_const.reshape(len(field_const) // t, t)
 
     opt_rc_actual = rc.optimized_rc(split_rc, half_full_round, partial_round, field_matrix)
-    assert functools.reduce(lambda x, y: x and y,
-                            map(lambda p, q: int(p, 16) == int(q), opt_rc_expected, opt_rc_actual), True)
+    expected = np.array(rc.hex_list_to_ints(opt_rc_expected), dtype=object)
+    actual = np.fromiter((int(x) for x in opt_rc_actual), dtype=object)
+    assert np.array_equal(expected, actual)
 
 
+@pytest.mark.slow
 @pytest.mark.parametrize("opt_mds_expected_pre,opt_mds_expected_sparse, mds_not_opt, partial_round, prime, t", [
     (poseidon.pre_matrix_neptune, poseidon.sparse_matrices_neptune, poseidon.matrix_neptune, 56, poseidon.prime_255, 4),
 ])
-def test_optimized_matrix(opt_mds_expected_pre, opt_mds_expected_sparse, mds_not_opt, partial_round, prime, t):
-    field_p = galois.GF(prime)
+def test_optimized_matrix(opt_mds_expected_pre, opt_mds_expected_sparse, mds_not_opt, partial_round, prime, t, gf):
+    field_p = gf(prime)
     field_matrix = rc.get_field_matrix_from_hex_matrix(field_p, mds_not_opt)
 
     pre_mds_actual, spare_mds_actual = rc.optimized_matrix(field_matrix, partial_round, field_p)
 
     hex_pre = rc.get_hex_matrix_from_field_matrix(pre_mds_actual, 64)
-    hex_spare = [rc.get_hex_matrix_from_field_matrix(x, 64) for x in spare_mds_actual]
+    hex_spare = rc.get_hex_matrix_from_field_matrix(spare_mds_actual, 64)
 
     assert np.array_equal(hex_pre, opt_mds_expected_pre)
     assert np.array_equal(hex_spare, opt_mds_expected_sparse)
+
+
+@pytest.mark.parametrize("mds, prime", [
+    (poseidon.matrix_64, poseidon.prime_64),
+])
+def test_gf_inv_small(mds, prime, gf):
+    field_p = gf(prime)
+    field_matrix = rc.get_field_matrix_from_hex_matrix(field_p, mds)
+
+    assert np.array_equal(rc.gf_inv_small(field_matrix, field_p), np.linalg.inv(field_matrix))
+    assert np.array_equal(rc.gf_inv_small(field_matrix, field_p) @ field_matrix, field_p.Identity(len(mds)))